@@ -1,8 +1,17 @@
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
 import time
 import json
+import operator
+import orjson
+import ijson
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
@@ -16,9 +25,98 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Multi-reference fields that Webflow rejects when sent empty
+_REFERENCE_FIELDS = frozenset(('tags', 'gallery', 'categories'))
+
+class _WebflowRetry(Retry):
+    """Retry policy that only re-sends POSTs on 429.
+    
+    POSTs create items, publish sites and register assets, so after a 5xx the
+    request may already have been applied; a 429 means it was never processed.
+    """
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method == 'POST' and status_code != 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+# Transparently retry rate-limited and transient server errors with exponential
+# backoff, honoring Retry-After; the final response is returned rather than raised.
+# Read errors are never retried, since the server may have received the request
+_WEBFLOW_RETRY = _WebflowRetry(
+    total=5,
+    read=False,
+    backoff_factor=1.0,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=True,
+    allowed_methods=frozenset(['GET', 'POST', 'PATCH']),
+    raise_on_status=False
+)
+
+class _Truncated:
+    """Log argument rendering obj as compact JSON capped at n characters.
+    
+    Serialization happens in __str__, so it only runs if the record is emitted.
+    """
+    __slots__ = ('obj', 'n')
+    
+    def __init__(self, obj, n=2000):
+        self.obj = obj
+        self.n = n
+    
+    def __str__(self):
+        s = json.dumps(self.obj, default=str)
+        return s if len(s) <= self.n else s[:self.n] + f'...({len(s) - self.n} more chars)'
+
+# Pulls both required keys of a bulk update item in one call
+_get_id_field_data = operator.itemgetter('id', 'fieldData')
+
+def _clean_pair(key, value):
+    """Return (keep, value) for a single fieldData entry sent to the Webflow API"""
+    # Omit None/null values and their string forms entirely
+    if value is None:
+        return False, None
+    
+    if isinstance(value, str):
+        if value in ('null', 'undefined'):
+            return False, None
+        
+        # Parse JSON strings (like image fields), keeping the string if parsing fails
+        if value[:1] == '{' and value[-1:] == '}':
+            try:
+                return True, json.loads(value)
+            except json.JSONDecodeError:
+                logger.warning("Failed to parse JSON for field %s: %s...", key, value[:100])
+                return True, value
+        
+        # Empty strings are omitted for reference fields
+        return not (key in _REFERENCE_FIELDS and value.strip() == ""), value
+    
+    # Empty arrays are omitted for reference fields
+    if isinstance(value, list) and not value and key in _REFERENCE_FIELDS:
+        return False, None
+    
+    # Keep all other values as-is
+    return True, value
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, so jsonify and request.get_json stay fast on large bulk payloads"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_INDENT_2 if kwargs.get('indent') else 0
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 class WebflowAPI:
+    """Webflow API v2 client shared by all Flask request threads.
+    
+    The session is thread-safe, bulk operations create their own chunk pools,
+    and the token bucket and ETag cache are only touched under their locks.
+    """
     def __init__(self):
         self.api_token = os.getenv('WEBFLOW_API_TOKEN')
         self.base_url = 'https://api.webflow.com/v2'
@@ -27,61 +125,172 @@ class WebflowAPI:
             'accept': 'application/json',
             'content-type': 'application/json'
         }
-        self.last_request_time = 0
         
-    def _rate_limit_delay(self):
-        """Implement rate limiting to respect API limits"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        min_delay = 1  # 1 second minimum delay between requests
+        # Token bucket sized to Webflow's 60 requests/minute limit: allows bursts
+        # up to capacity and only blocks once the bucket is empty
+        self._capacity = 60
+        self._refill_rate = 1.0  # tokens per second
+        self._tokens = float(self._capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
         
-        if time_since_last_request < min_delay:
-            time.sleep(min_delay - time_since_last_request)
+        # URL -> (etag, raw response body, validated at) for rarely-changing GETs.
+        # Bodies are kept as bytes and parsed per hit, so callers can't mutate the cache.
+        # Entries validated within the TTL are served without a request; older
+        # ones are revalidated with If-None-Match. Oldest entries are evicted first
+        self._etag_cache = {}
+        self._etag_lock = threading.Lock()
+        self._etag_ttl = 60
+        self._etag_max_entries = 256
+        self.max_workers = 4  # Concurrent chunk requests per bulk operation
+        
+        # Persistent session so bulk chunks reuse pooled keep-alive connections
+        # instead of paying a fresh TCP+TLS handshake on every call
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Only api.webflow.com goes through this session, so a single host pool is
+        # enough; its size covers the bulk chunk workers plus concurrent UI calls
+        self.session.mount('https://api.webflow.com/', HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_workers * 4,
+            max_retries=_WEBFLOW_RETRY
+        ))
+        
+    def _refill_tokens(self):
+        """Top up the token bucket for the time elapsed since the last refill (call under lock)"""
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self._refill_rate)
+        self._last_refill = now
+    
+    def _rate_limit_delay(self):
+        """Implement token-bucket rate limiting to respect API limits (safe across worker threads)"""
+        # Take a token under the lock; if the bucket is empty this reserves a
+        # future token and the wait happens outside the lock
+        with self._lock:
+            self._refill_tokens()
+            self._tokens -= 1
+            wait = -self._tokens / self._refill_rate if self._tokens < 0 else 0
         
-        self.last_request_time = time.time()
+        if wait > 0:
+            time.sleep(wait)
     
-    def _make_request(self, method, endpoint, data=None, params=None):
-        """Make authenticated API request with error handling"""
+    def _drain_rate_limit(self, retry_after):
+        """Empty the token bucket so no request is sent before Retry-After elapses"""
+        with self._lock:
+            self._refill_tokens()
+            self._tokens = min(self._tokens, 0) - retry_after * self._refill_rate
+    
+    def _sync_rate_limit(self, remaining):
+        """Cap the token bucket at the quota Webflow reports as remaining"""
+        with self._lock:
+            self._refill_tokens()
+            self._tokens = min(self._tokens, remaining)
+    
+    def _store_etag(self, url, etag, body):
+        """Cache a validated response body for url, or evict it when there is no ETag"""
+        with self._etag_lock:
+            self._etag_cache.pop(url, None)
+            if not etag:
+                return
+            self._etag_cache[url] = (etag, body, time.monotonic())
+            while len(self._etag_cache) > self._etag_max_entries:
+                del self._etag_cache[next(iter(self._etag_cache))]
+    
+    def _make_request(self, method, endpoint, data=None, params=None, use_etag=False, stream=False):
+        """Make authenticated API request with error handling
+        
+        With use_etag, GET responses are cached by URL: recently validated
+        entries are returned without a request, older ones are revalidated
+        with If-None-Match so an unchanged resource comes back as a bodiless 304.
+        With stream, a successful GET body is parsed incrementally with ijson
+        as it is read off the socket instead of being buffered first.
+        """
         if not self.api_token:
             logger.error("API token not configured")
             return {'success': False, 'error': 'API token not configured'}
         
-        self._rate_limit_delay()
-        
         url = f"{self.base_url}{endpoint}"
         
+        cached = None
+        if use_etag and method == 'GET':
+            with self._etag_lock:
+                cached = self._etag_cache.get(url)
+            if cached and time.monotonic() - cached[2] < self._etag_ttl:
+                logger.info("Using recently validated cached response for %s", url)
+                return {'success': True, 'data': orjson.loads(cached[1])}
+        
+        body = None
+        if data and method in ['POST', 'PATCH']:
+            # Serialize once and send these bytes as the request body; stdlib json
+            # covers values orjson rejects, such as integers wider than 64 bits
+            try:
+                try:
+                    body = orjson.dumps(data)
+                except orjson.JSONEncodeError:
+                    body = json.dumps(data).encode()
+            except (TypeError, ValueError) as e:
+                error_msg = f'Could not encode request data as JSON: {str(e)}'
+                logger.error(error_msg)
+                return {'success': False, 'error': error_msg}
+        
+        self._rate_limit_delay()
+        
         # Log request details
-        logger.info(f"Making {method} request to {url}")
+        logger.info("Making %s request to %s", method, url)
         if params:
-            logger.info(f"Request params: {params}")
-        if data and method in ['POST', 'PATCH']:
-            # Log data but truncate if too large
-            data_str = json.dumps(data, indent=2)[:1000]
-            if len(json.dumps(data)) > 1000:
-                data_str += "... (truncated)"
-            logger.info(f"Request data: {data_str}")
+            logger.info("Request params: %s", params)
+        if body is not None:
+            logger.info("Request body size: %d bytes", len(body))
+            if logger.isEnabledFor(logging.DEBUG):
+                # Log data but truncate if too large
+                data_str = json.dumps(data, indent=2)[:1000]
+                if len(body) > 1000:
+                    data_str += "... (truncated)"
+                logger.debug("Request data: %s", data_str)
+        
+        if method not in ['GET', 'POST', 'PATCH']:
+            logger.error("Unsupported HTTP method: %s", method)
+            return {'success': False, 'error': f'Unsupported method: {method}'}
         
+        request_headers = {'If-None-Match': cached[0]} if cached else None
+        
+        response = None
         try:
             if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=30)
-            elif method == 'PATCH':
-                response = requests.patch(url, headers=self.headers, json=data, timeout=30)
+                response = self.session.request(method, url, params=params, headers=request_headers,
+                                                timeout=30, stream=stream)
             else:
-                logger.error(f"Unsupported HTTP method: {method}")
-                return {'success': False, 'error': f'Unsupported method: {method}'}
+                response = self.session.request(method, url, data=body, timeout=30)
             
             # Log response details
-            logger.info(f"Response status: {response.status_code}")
+            logger.info("Response status: %s", response.status_code)
+            
+            # Read small streamed error bodies in full so the connection returns to the pool
+            if stream and response.status_code >= 400:
+                response.content
             
             # Check rate limit headers
             remaining = response.headers.get('X-RateLimit-Remaining')
-            if remaining:
-                logger.info(f"Rate limit remaining: {remaining}")
+            if remaining and remaining.isdigit():
+                logger.info("Rate limit remaining: %s", remaining)
+                # Pace every thread by the server's count rather than sleeping only this one
+                self._sync_rate_limit(int(remaining))
                 if int(remaining) < 10:
-                    logger.warning("Approaching rate limit, adding extra delay")
-                    time.sleep(2)
+                    logger.warning("Approaching rate limit, slowing down requests")
+            
+            # Resource unchanged since the cached ETag was issued
+            if response.status_code == 304 and cached:
+                logger.info("Not modified, using cached response for %s", url)
+                self._store_etag(url, cached[0], cached[1])
+                return {'success': True, 'data': orjson.loads(cached[1])}
+            
+            # A 429 here means the adapter's retries are exhausted; make every
+            # worker back off before reporting it like any other API error
+            if response.status_code == 429:
+                try:
+                    self._drain_rate_limit(float(response.headers.get('Retry-After', 60)))
+                except ValueError:
+                    self._drain_rate_limit(60)
             
             # Handle different error conditions
             if response.status_code == 401:
@@ -90,12 +299,7 @@ class WebflowAPI:
                 return {'success': False, 'error': error_msg}
             elif response.status_code == 404:
                 error_msg = 'Resource not found. Please verify site/collection IDs.'
-                logger.error(f"{error_msg} URL: {url}")
-                return {'success': False, 'error': error_msg}
-            elif response.status_code == 429:
-                retry_after = response.headers.get('Retry-After', '60')
-                error_msg = f'Rate limit exceeded. Please wait {retry_after} seconds.'
-                logger.error(error_msg)
+                logger.error("%s URL: %s", error_msg, url)
                 return {'success': False, 'error': error_msg}
             elif response.status_code >= 400:
                 try:
@@ -103,13 +307,13 @@ class WebflowAPI:
                     error_msg = response_data.get('message', f'HTTP {response.status_code} error')
                     
                     # Log detailed error information
-                    logger.error(f"API error {response.status_code}: {error_msg}")
-                    logger.error(f"Full response: {json.dumps(response_data, indent=2)}")
+                    logger.error("API error %s: %s", response.status_code, error_msg)
+                    logger.error("Full response: %s", _Truncated(response_data))
                     
                     # Check for field-specific errors
                     if 'details' in response_data or 'errors' in response_data:
                         details = response_data.get('details', response_data.get('errors', []))
-                        logger.error(f"Error details: {json.dumps(details, indent=2)}")
+                        logger.error("Error details: %s", _Truncated(details))
                         return {
                             'success': False, 
                             'error': error_msg,
@@ -128,8 +332,21 @@ class WebflowAPI:
                     return {'success': False, 'error': error_msg}
             
             # Success case
-            response_data = response.json()
-            logger.info(f"Request successful. Response size: {len(json.dumps(response_data))} characters")
+            if stream:
+                # The response object (items, pagination) is built while the body downloads
+                response.raw.decode_content = True
+                response_data = next(ijson.items(response.raw, '', use_float=True), None)
+                if not isinstance(response_data, dict):
+                    error_msg = 'Invalid JSON response from Webflow API'
+                    logger.error("%s: expected an object, got %s", error_msg, type(response_data).__name__)
+                    return {'success': False, 'error': error_msg}
+                logger.info("Request successful. Streamed response keys: %s", list(response_data))
+                return {'success': True, 'data': response_data}
+            
+            response_data = orjson.loads(response.content)
+            logger.info("Request successful. Response bytes: %d", len(response.content))
+            if use_etag and method == 'GET':
+                self._store_etag(url, response.headers.get('ETag'), response.content)
             return {'success': True, 'data': response_data}
             
         except requests.exceptions.Timeout:
@@ -148,22 +365,40 @@ class WebflowAPI:
             error_msg = 'Invalid JSON response from Webflow API'
             logger.error(f"{error_msg}. Raw response: {response.text[:500]}")
             return {'success': False, 'error': error_msg}
+        except ijson.JSONError as e:
+            # The streamed body is already consumed, so only the parser error is available
+            error_msg = 'Invalid JSON response from Webflow API'
+            logger.error("%s: %s", error_msg, e)
+            return {'success': False, 'error': error_msg}
+        # Failures while reading a streamed body come straight from urllib3, unwrapped by requests
+        except ReadTimeoutError:
+            error_msg = 'Request timeout - Webflow API took too long to respond'
+            logger.error(error_msg)
+            return {'success': False, 'error': error_msg}
+        except ProtocolError:
+            error_msg = 'Connection error - Unable to reach Webflow API'
+            logger.error(error_msg)
+            return {'success': False, 'error': error_msg}
         except Exception as e:
             error_msg = f'Unexpected error: {str(e)}'
             logger.error(error_msg, exc_info=True)
             return {'success': False, 'error': error_msg}
+        finally:
+            # Streamed responses hold their connection until closed, on every return path
+            if stream and response is not None:
+                response.close()
     
-    def get_sites(self):
+    def get_sites(self, use_etag=True):
         """Fetch all sites accessible to the API token"""
-        return self._make_request('GET', '/sites')
+        return self._make_request('GET', '/sites', use_etag=use_etag)
     
     def get_collections(self, site_id):
         """Fetch all collections for a specific site"""
-        return self._make_request('GET', f'/sites/{site_id}/collections')
+        return self._make_request('GET', f'/sites/{site_id}/collections', use_etag=True)
     
     def get_collection_schema(self, collection_id):
         """Fetch collection schema/structure"""
-        return self._make_request('GET', f'/collections/{collection_id}')
+        return self._make_request('GET', f'/collections/{collection_id}', use_etag=True)
     
     def get_collection_items(self, collection_id, limit=100, offset=0):
         """Fetch collection items with pagination, filtering out archived items"""
@@ -174,7 +409,7 @@ class WebflowAPI:
             # 'isArchived': 'false'  # This might work but let's test first
         }
         
-        result = self._make_request('GET', f'/collections/{collection_id}/items', params=params)
+        result = self._make_request('GET', f'/collections/{collection_id}/items', params=params, stream=True)
         
         if result['success'] and 'data' in result:
             items = result['data'].get('items', [])
@@ -214,170 +449,150 @@ class WebflowAPI:
     
     def update_collection_items(self, collection_id, items_data):
         """Bulk update collection items"""
-        logger.info(f"Starting bulk update for collection {collection_id} with {len(items_data)} items")
+        logger.info("Starting bulk update for collection %s with %d items", collection_id, len(items_data))
+        
+        # Validate, clean and split into chunks of 100 items max per request in one pass
+        chunk_payloads = []
+        try:
+            for chunk_num, chunk in enumerate(self._build_chunks(items_data, include_id=True), 1):
+                logger.info("Processing chunk %d with %d items", chunk_num, len(chunk))
+                
+                # Log the first item in each chunk for debugging
+                first_item = chunk[0]
+                logger.info("Sample item ID: %s", first_item['id'])
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Sample cleaned fieldData keys: %s", list(first_item['fieldData'].keys()))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Sample cleaned fieldData values: %s", json.dumps(first_item['fieldData'], indent=2))
+                
+                chunk_payloads.append((chunk_num, {'items': chunk}))
+        except ValueError as e:
+            return [{'success': False, 'error': str(e)}]
         
-        # Validate items data structure
+        if not chunk_payloads:
+            logger.warning("No valid items to update after cleaning")
+            return [{'success': True, 'message': 'No valid items to update'}]
+        
+        results = self._send_chunks('PATCH', f'/collections/{collection_id}/items', chunk_payloads, 'updated')
+            
+        # Log summary
+        successful_chunks = sum(1 for r in results if r['success'])
+        logger.info("Bulk update completed: %d/%d chunks successful", successful_chunks, len(results))
+        
+        return results
+    
+    def _build_chunks(self, items_data, include_id, chunk_size=100):
+        """Validate and clean items in a single pass, yielding chunks of at most chunk_size items.
+        
+        Raises ValueError for the first item missing a required field.
+        """
+        # Chunks are preallocated and filled by index to avoid list regrowth
+        chunk = [None] * chunk_size
+        j = 0
         for i, item in enumerate(items_data):
-            if 'id' not in item:
-                logger.error(f"Item {i} missing required 'id' field")
-                return [{'success': False, 'error': f'Item {i} missing required id field'}]
-            if 'fieldData' not in item:
-                logger.error(f"Item {i} ({item['id']}) missing required 'fieldData' field")
-                return [{'success': False, 'error': f'Item {item["id"]} missing required fieldData field'}]
-        
-        # Split into chunks of 100 items max per request
-        chunk_size = 100
-        results = []
-        total_chunks = (len(items_data) + chunk_size - 1) // chunk_size
-        
-        for i in range(0, len(items_data), chunk_size):
-            chunk_num = (i // chunk_size) + 1
-            chunk = items_data[i:i + chunk_size]
-            
-            logger.info(f"Processing chunk {chunk_num}/{total_chunks} with {len(chunk)} items")
-            
-            # Clean field data for each item in the chunk
-            cleaned_chunk = []
-            for item in chunk:
-                cleaned_field_data = self.clean_field_data(item['fieldData'])
-                if cleaned_field_data:  # Only include items with valid field data
-                    cleaned_chunk.append({
-                        'id': item['id'],
-                        'fieldData': cleaned_field_data
-                    })
+            try:
+                if include_id:
+                    item_id, field_data = _get_id_field_data(item)
                 else:
-                    logger.warning(f"Skipping item {item['id']} with no valid field data")
+                    field_data = item['fieldData']
+            except KeyError:
+                if include_id and 'id' not in item:
+                    logger.error("Item %d missing required 'id' field", i)
+                    raise ValueError(f'Item {i} missing required id field')
+                if include_id:
+                    logger.error("Item %d (%s) missing required 'fieldData' field", i, item['id'])
+                    raise ValueError(f'Item {item["id"]} missing required fieldData field')
+                logger.error("New item %d missing required 'fieldData' field", i)
+                raise ValueError(f'New item {i} missing required fieldData field')
             
-            if not cleaned_chunk:
-                logger.warning(f"Chunk {chunk_num}/{total_chunks} has no valid items after cleaning")
-                results.append({'success': True, 'message': 'No valid items to update in chunk'})
+            cleaned_field_data = self.clean_field_data(field_data)
+            if not cleaned_field_data:  # Only include items with valid field data
+                if include_id:
+                    logger.warning("Skipping item %s with no valid field data", item_id)
+                else:
+                    logger.warning("Skipping new item with no valid field data")
                 continue
             
-            # Log the first item in each chunk for debugging
-            if cleaned_chunk:
-                first_item = cleaned_chunk[0]
-                logger.info(f"Sample item ID: {first_item['id']}")
-                logger.info(f"Sample cleaned fieldData keys: {list(first_item['fieldData'].keys())}")
-                logger.info(f"Sample cleaned fieldData values: {json.dumps(first_item['fieldData'], indent=2)}")
-            
-            chunk = cleaned_chunk  # Replace original chunk with cleaned data
+            if include_id:
+                chunk[j] = {'id': item_id, 'fieldData': cleaned_field_data}
+            else:
+                # New items only carry fieldData; temporary IDs are dropped
+                chunk[j] = {'fieldData': cleaned_field_data}
+            j += 1
             
-            data = {'items': chunk}
-            logger.info(f"Sending PATCH request with data: {json.dumps(data, indent=2)[:1000]}...")
-            result = self._make_request('PATCH', f'/collections/{collection_id}/items', data)
+            if j == chunk_size:
+                yield chunk
+                chunk = [None] * chunk_size
+                j = 0
+        
+        if j:
+            del chunk[j:]
+            yield chunk
+    
+    def _send_chunks(self, method, endpoint, chunk_payloads, action):
+        """Send (chunk_num, data) payloads concurrently, returning results in chunk order"""
+        total_chunks = len(chunk_payloads)
+        
+        def send_chunk(chunk_payload):
+            # Never raise: a failure here must not discard results of chunks already sent
+            chunk_num, data = chunk_payload
+            try:
+                result = self._make_request(method, endpoint, data)
+            except Exception as e:
+                logger.error("Chunk %d/%d raised an unexpected error", chunk_num, total_chunks, exc_info=True)
+                result = {'success': False, 'error': f'Unexpected error: {str(e)}'}
             
             if result['success']:
-                logger.info(f"Chunk {chunk_num}/{total_chunks} updated successfully")
+                logger.info("Chunk %d/%d %s successfully", chunk_num, total_chunks, action)
             else:
-                logger.error(f"Chunk {chunk_num}/{total_chunks} failed: {result['error']}")
+                logger.error("Chunk %d/%d failed: %s", chunk_num, total_chunks, result['error'])
                 if 'details' in result:
-                    logger.error(f"Failure details: {json.dumps(result['details'], indent=2)}")
+                    logger.error("Failure details: %s", _Truncated(result['details']))
             
-            results.append(result)
-            
-        # Log summary
-        successful_chunks = sum(1 for r in results if r['success'])
-        logger.info(f"Bulk update completed: {successful_chunks}/{len(results)} chunks successful")
+            return result
         
-        return results
+        # Each bulk operation gets its own pool so concurrent jobs interleave on the
+        # shared token bucket, which alone keeps the aggregate rate within the API quota
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='webflow-chunk') as executor:
+            return list(executor.map(send_chunk, chunk_payloads))
     
     def clean_field_data(self, field_data):
         """Clean and convert field data to proper types for Webflow API"""
         cleaned_data = {}
-        
         for key, value in field_data.items():
-            # Handle string "null" values
-            if value == "null" or value == "undefined":
-                logger.info(f"Skipping field {key} with string null/undefined value")
-                continue  # Omit the field entirely
-            
-            # Handle actual None/null values
-            if value is None:
-                logger.info(f"Skipping field {key} with None value")
-                continue  # Omit the field entirely
-            
-            # Handle JSON strings (like image fields)
-            if isinstance(value, str):
-                # Try to parse JSON strings
-                if value.startswith('{') and value.endswith('}'):
-                    try:
-                        parsed_value = json.loads(value)
-                        cleaned_data[key] = parsed_value
-                        logger.info(f"Parsed JSON for field {key}")
-                        continue
-                    except json.JSONDecodeError:
-                        logger.warning(f"Failed to parse JSON for field {key}: {value[:100]}...")
-                        # Keep as string if parsing fails
-                
-                # Handle empty strings that should be omitted for reference fields
-                if value.strip() == "" and key in ['tags', 'gallery', 'categories']:
-                    logger.info(f"Skipping empty reference field {key}")
-                    continue
-            
-            # Handle empty arrays
-            if isinstance(value, list) and len(value) == 0:
-                # For reference fields, omit empty arrays
-                if key in ['tags', 'gallery', 'categories']:
-                    logger.info(f"Skipping empty array for reference field {key}")
-                    continue
-            
-            # Keep all other values as-is
-            cleaned_data[key] = value
-            
-        logger.info(f"Cleaned field data: {len(field_data)} -> {len(cleaned_data)} fields")
+            keep, new_value = _clean_pair(key, value)
+            if keep:
+                cleaned_data[key] = new_value
+        
+        if len(cleaned_data) != len(field_data) and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cleaned field data: %d -> %d fields (dropped %s)", len(field_data), len(cleaned_data),
+                         [key for key in field_data if key not in cleaned_data])
         return cleaned_data
     
     def create_collection_items(self, collection_id, items_data):
         """Create new collection items"""
-        logger.info(f"Starting bulk create for collection {collection_id} with {len(items_data)} items")
-        
-        # Validate items data structure
-        for i, item in enumerate(items_data):
-            if 'fieldData' not in item:
-                logger.error(f"New item {i} missing required 'fieldData' field")
-                return [{'success': False, 'error': f'New item {i} missing required fieldData field'}]
-        
-        # Remove temporary IDs from new items and clean field data
-        clean_items = []
-        for item in items_data:
-            cleaned_field_data = self.clean_field_data(item['fieldData'])
-            if cleaned_field_data:  # Only include items with valid field data
-                clean_item = {'fieldData': cleaned_field_data}
-                clean_items.append(clean_item)
-            else:
-                logger.warning(f"Skipping new item with no valid field data")
+        logger.info("Starting bulk create for collection %s with %d items", collection_id, len(items_data))
         
-        # Split into chunks of 100 items max per request
-        chunk_size = 100
-        results = []
-        total_chunks = (len(clean_items) + chunk_size - 1) // chunk_size
+        # Validate, clean and split into chunks of 100 items max per request in one pass
+        chunk_payloads = []
+        try:
+            for chunk_num, chunk in enumerate(self._build_chunks(items_data, include_id=False), 1):
+                logger.info("Creating chunk %d with %d items", chunk_num, len(chunk))
+                
+                # Log the first item in each chunk for debugging
+                if logger.isEnabledFor(logging.INFO):
+                    first_item = chunk[0]
+                    logger.info("Sample new item fieldData keys: %s", list(first_item['fieldData'].keys()))
+                
+                chunk_payloads.append((chunk_num, {'items': chunk}))
+        except ValueError as e:
+            return [{'success': False, 'error': str(e)}]
         
-        for i in range(0, len(clean_items), chunk_size):
-            chunk_num = (i // chunk_size) + 1
-            chunk = clean_items[i:i + chunk_size]
-            
-            logger.info(f"Creating chunk {chunk_num}/{total_chunks} with {len(chunk)} items")
-            
-            # Log the first item in each chunk for debugging
-            if chunk:
-                first_item = chunk[0]
-                logger.info(f"Sample new item fieldData keys: {list(first_item['fieldData'].keys())}")
-            
-            data = {'items': chunk}
-            result = self._make_request('POST', f'/collections/{collection_id}/items', data)
-            
-            if result['success']:
-                logger.info(f"Chunk {chunk_num}/{total_chunks} created successfully")
-            else:
-                logger.error(f"Chunk {chunk_num}/{total_chunks} failed: {result['error']}")
-                if 'details' in result:
-                    logger.error(f"Failure details: {json.dumps(result['details'], indent=2)}")
-            
-            results.append(result)
+        results = self._send_chunks('POST', f'/collections/{collection_id}/items', chunk_payloads, 'created')
             
         # Log summary
         successful_chunks = sum(1 for r in results if r['success'])
-        logger.info(f"Bulk create completed: {successful_chunks}/{len(results)} chunks successful")
+        logger.info("Bulk create completed: %d/%d chunks successful", successful_chunks, len(results))
         
         return results
     
@@ -422,13 +637,13 @@ class WebflowAPI:
             
             self._rate_limit_delay()
             
-            response = requests.post(url, headers=self.headers, json=data, timeout=60)
+            response = self.session.request('POST', url, json=data, timeout=60)
             
             logger.info(f"Asset creation response status: {response.status_code}")
             
             if response.status_code in [200, 201, 202]:  # 202 = Accepted
                 result_data = response.json()
-                logger.info(f"Asset creation successful: {json.dumps(result_data, indent=2)}")
+                logger.info("Asset creation successful: %s", _Truncated(result_data))
                 
                 # Step 3: Upload file to S3 using upload details
                 upload_details = result_data.get('uploadDetails')
@@ -494,7 +709,7 @@ class WebflowAPI:
                 try:
                     error_data = response.json()
                     error_msg += f": {error_data.get('message', error_data)}"
-                    logger.error(f"Detailed error: {json.dumps(error_data, indent=2)}")
+                    logger.error("Detailed error: %s", _Truncated(error_data))
                 except:
                     error_msg += f": {response.text[:200]}"
                 
@@ -516,8 +731,155 @@ class WebflowAPI:
             
         return self._make_request('POST', f'/sites/{site_id}/publish', data)
 
+class CoalescingBuffer:
+    """Merges update requests for one collection that arrive while a PATCH is in flight.
+    
+    With nothing outstanding, an update is sent straight away on the caller's
+    thread. Updates submitted while that PATCH runs are buffered and sent
+    together as one update once it completes. Each caller gets a Future
+    resolving to the results for its own items. If any chunk of a combined
+    update fails, each submitter's items are resent on their own, so a caller
+    never gets a failure (or error details) caused by another caller's values.
+    """
+    def __init__(self, api, collection_id):
+        self.api = api
+        self.collection_id = collection_id
+        self._lock = threading.Lock()
+        self._pending = []  # (items, future) per submitting request
+        self._in_flight = False
+    
+    @staticmethod
+    def accepts(items):
+        """Whether items are well-formed enough to be merged with other submitters' items"""
+        return isinstance(items, list) and all(
+            isinstance(item, dict)
+            and isinstance(item.get('id'), str)
+            and isinstance(item.get('fieldData'), dict)
+            for item in items
+        )
+    
+    def submit(self, items):
+        """Send items now, or buffer them behind the PATCH in flight; returns a Future for the results"""
+        if not self.accepts(items):
+            raise ValueError('Coalesced items need a string id and a fieldData object')
+        
+        future = Future()
+        with self._lock:
+            self._pending.append((items, future))
+            if self._in_flight:
+                return future  # Sent with the next batch once the current PATCH completes
+            self._in_flight = True
+            batch = self._take_batch()
+        
+        self._send(batch)
+        
+        # Anything buffered meanwhile is drained in the background so this caller can return
+        with self._lock:
+            if not self._pending:
+                self._in_flight = False
+                return future
+        threading.Thread(target=self._drain, daemon=True).start()
+        return future
+    
+    def _drain(self):
+        """Send buffered batches until nothing is left pending"""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._in_flight = False
+                    return
+                batch = self._take_batch()
+            self._send(batch)
+    
+    def _take_batch(self):
+        """Detach the pending updates (call under lock)"""
+        batch, self._pending = self._pending, []
+        return batch
+    
+    def _send(self, batch):
+        """Send a batch as one update, resolving every submitter's future whatever happens"""
+        try:
+            # Later edits to the same item win, so merge per item ID in arrival order
+            merged = {}
+            for items, _ in batch:
+                for item in items:
+                    if item['id'] in merged:
+                        merged[item['id']]['fieldData'].update(item['fieldData'])
+                    else:
+                        merged[item['id']] = {'id': item['id'], 'fieldData': dict(item['fieldData'])}
+            
+            logger.info("Flushing %d coalesced updates (%d items) for collection %s",
+                        len(batch), len(merged), self.collection_id)
+            results = self.api.update_collection_items(self.collection_id, list(merged.values()))
+            
+            if len(batch) > 1 and not all(r['success'] for r in results):
+                # Any submitter's values may have caused the failure; resend each
+                # update separately, in arrival order, so results are per caller
+                logger.warning("Coalesced update for collection %s failed, resending %d updates separately",
+                               self.collection_id, len(batch))
+                for items, future in batch:
+                    self._send_alone(items, future)
+                return
+        except Exception as e:
+            logger.error("Coalesced update for collection %s failed: %s", self.collection_id, e, exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        if len(batch) == 1:
+            batch[0][1].set_result(results)
+            return
+        for items, future in batch:
+            future.set_result(self._results_for(results, {item['id'] for item in items}))
+    
+    @staticmethod
+    def _results_for(results, item_ids):
+        """Trim combined chunk results down to the chunks and items of one submitter"""
+        own_results = []
+        for result in results:
+            data = result.get('data')
+            items = data.get('items') if isinstance(data, dict) else None
+            if not isinstance(items, list):
+                own_results.append(result)
+                continue
+            own_items = [item for item in items if isinstance(item, dict) and item.get('id') in item_ids]
+            if own_items:
+                own_results.append({**result, 'data': {**data, 'items': own_items}})
+        return own_results or [{'success': True, 'message': 'No valid items to update'}]
+    
+    def _send_alone(self, items, future):
+        """Send one submitter's items as their own update"""
+        try:
+            future.set_result(self.api.update_collection_items(self.collection_id, items))
+        except Exception as e:
+            future.set_exception(e)
+
 webflow_api = WebflowAPI()
 
+# Per-collection buffers for coalescing small update requests
+_update_buffers = {}
+_update_buffers_lock = threading.Lock()
+
+def _coalesced_update(collection_id, items_data):
+    """Submit a small update to its collection's buffer and wait for its own results
+    
+    There is no wait timeout: the buffer resolves every future, and the wait is
+    bounded by the PATCH itself, so a caller is never told an update failed
+    while it may still be applied.
+    """
+    with _update_buffers_lock:
+        buffer = _update_buffers.get(collection_id)
+        if buffer is None:
+            buffer = _update_buffers[collection_id] = CoalescingBuffer(webflow_api, collection_id)
+    
+    try:
+        return buffer.submit(items_data).result()
+    except Exception as e:
+        error_msg = f'Update failed: {str(e)}'
+        logger.error(error_msg, exc_info=True)
+        return [{'success': False, 'error': error_msg}]
+
 @app.route('/')
 def index():
     """Main bulk editor interface"""
@@ -612,7 +974,7 @@ def create_collection_items(collection_id):
             'results': results
         }
         
-        logger.error(f"Bulk create partially/completely failed: {json.dumps(detailed_error, indent=2)}")
+        logger.error("Bulk create partially/completely failed: %s", _Truncated(detailed_error))
         return jsonify(detailed_error), 400
     
     logger.info(f"Bulk create completed successfully for all {len(results)} batches")
@@ -642,7 +1004,13 @@ def update_collection_items(collection_id):
         sample_item = items_data[0]
         logger.info(f"Sample item structure - ID: {sample_item.get('id', 'MISSING')}, fieldData keys: {list(sample_item.get('fieldData', {}).keys())}")
     
-    results = webflow_api.update_collection_items(collection_id, items_data)
+    # Small, well-formed updates are sent at once, or merged into one PATCH with
+    # others that arrive while an update for the same collection is in flight;
+    # anything else (including items that fail validation) goes straight through
+    if len(items_data) < 100 and CoalescingBuffer.accepts(items_data):
+        results = _coalesced_update(collection_id, items_data)
+    else:
+        results = webflow_api.update_collection_items(collection_id, items_data)
     
     # Analyze results in detail
     successful_batches = [r for r in results if r['success']]
@@ -666,7 +1034,7 @@ def update_collection_items(collection_id):
             'results': results
         }
         
-        logger.error(f"Bulk update partially/completely failed: {json.dumps(detailed_error, indent=2)}")
+        logger.error("Bulk update partially/completely failed: %s", _Truncated(detailed_error))
         return jsonify(detailed_error), 400
     
     logger.info(f"Bulk update completed successfully for all {len(results)} batches")
@@ -863,8 +1231,8 @@ def health_check():
             'error': 'API token not configured. Please add WEBFLOW_API_TOKEN to your .env file.'
         }), 400
     
-    # Test API token by fetching sites
-    result = webflow_api.get_sites()
+    # Test API token by fetching sites, bypassing the cache so Webflow is always contacted
+    result = webflow_api.get_sites(use_etag=False)
     return jsonify({
         'success': result['success'],
         'error': result.get('error') if not result['success'] else None
@@ -876,8 +1244,11 @@ if __name__ == '__main__':
         print("   Please create a .env file with your Webflow API token.")
         print("   Example: WEBFLOW_API_TOKEN=your_token_here")
     
+    # Development server only; set DEV=1 for the debugger and auto-reloader.
+    # For concurrent bulk jobs run under gunicorn instead (see wsgi.py)
     app.run(
         host='127.0.0.1',
         port=5000,
-        debug=True
+        debug=os.getenv('DEV', '').lower() in ('1', 'true'),
+        threaded=True
     )
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""WSGI entry point for running the bulk editor under gunicorn, e.g.
+
+    gunicorn --workers 4 --worker-class gthread --threads 8 --bind 127.0.0.1:5000 wsgi:app
+"""
+from app import app